@@ -6,6 +6,7 @@ import os
 from PIL import Image
 from core.job_sources import fetch_jobs
 from core.notifier import send_email
+from core.profiler import list_profiles
 
 
 # ---------- STREAMLIT SETUP ----------
@@ -77,6 +78,18 @@ with st.sidebar:
             default=user_conf.get("sources", ["RemoteOK"])
         )
 
+    # --- Profiling ---
+    with st.expander("🧪 Profiling", expanded=False):
+        profile_modes = ["Off", "Deterministic", "Sampling"]
+        saved_profile = (user_conf.get("profile") or "off").capitalize()
+        profile_mode = st.selectbox(
+            "⏱️ Profiling Mode",
+            profile_modes,
+            index=profile_modes.index(saved_profile) if saved_profile in profile_modes else 0,
+            help="Profiles fetch_jobs, is_relevant_position and send_email runs. "
+                 "Takes effect after saving. PYREMOTE_PROFILE overrides this setting."
+        )
+
     # --- Save Preferences ---
     save_pref = st.button("💾 Save Preferences")
     if save_pref:
@@ -85,7 +98,8 @@ with st.sidebar:
             "email": email,
             "keywords": [k.strip() for k in keywords.split(",") if k.strip()],
             "sources": sources,
-            "experience": experience
+            "experience": experience,
+            "profile": profile_mode.lower()
         }
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
             json.dump(user_conf, f, indent=4, ensure_ascii=False)
@@ -203,6 +217,20 @@ if "csv_data" in st.session_state and st.session_state["csv_data"]:
 else:
     st.info("Run a search to enable CSV export.")
 
+profile_paths = list_profiles()
+if profile_paths:
+    st.subheader("🧪 Profiling Reports")
+    st.caption("Collapsed stacks open in flamegraph.pl or speedscope; allocation reports list the top tracemalloc sites.")
+    for path in profile_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            st.download_button(
+                label=f"⬇️ {os.path.basename(path)}",
+                data=f.read(),
+                file_name=os.path.basename(path),
+                mime="text/plain",
+                key=f"profile_{path}"
+            )
+
 st.markdown("---")
 st.header("Quick Analytics (by Source)")
 
@@ -2,26 +2,62 @@ import requests
 import feedparser
 import time
 from rapidfuzz import fuzz
-from sentence_transformers import SentenceTransformer, util
-# torch required by sentence-transformers backend
-import torch  # noqa: F401
+from core import scoring_service
+from core.profiler import profiled
 
 
 # ---------------------------------------------------------------------------
-# ⚙️ Load the semantic model once (cached for speed)
+# ⚙️ Load the semantic model lazily (only when the scoring service is not running)
 # ---------------------------------------------------------------------------
-print("🧠 Loading SentenceTransformer model... This may take a few seconds.")
-model = SentenceTransformer("all-MiniLM-L6-v2")
+model = None
+
+
+def get_model():
+    """Load the in-process SentenceTransformer model on first use."""
+    global model
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        # torch required by sentence-transformers backend
+        import torch  # noqa: F401
+
+        print("🧠 Loading SentenceTransformer model... This may take a few seconds.")
+        model = SentenceTransformer(scoring_service.MODEL_NAME)
+    return model
+
+
+def semantic_scores(position, titles):
+    """
+    Cosine similarity between a position and each title.
+    Uses the shared scoring service when running, otherwise the local model.
+    """
+    position_lower = position.lower()
+    titles_lower = [t.lower() for t in titles]
+    if not titles_lower:
+        return []
+
+    scores = scoring_service.score_pairs([(position_lower, t) for t in titles_lower])
+    if scores is not None:
+        return scores
+
+    from sentence_transformers import util
+
+    local_model = get_model()
+    emb1 = local_model.encode(position_lower, convert_to_tensor=True)
+    emb2 = local_model.encode(titles_lower, convert_to_tensor=True)
+    return [float(s) for s in util.cos_sim(emb1, emb2)[0]]
 
 
 # ---------------------------------------------------------------------------
 # 🔍 SMART MATCHING LOGIC (Hybrid + Domain Isolation)
 # ---------------------------------------------------------------------------
 
-def is_relevant_position(position, title, desc=None, fuzzy_threshold=82, semantic_threshold=0.68):
+@profiled("is_relevant_position")
+def is_relevant_position(position, title, desc=None, fuzzy_threshold=82, semantic_threshold=0.68,
+                         semantic_score=None):
     """
     Determine if a job title/description is relevant to the searched position.
     Combines fuzzy matching, semantic similarity, and domain context filtering.
+    A precomputed `semantic_score` (see `semantic_scores`) skips the model call.
     """
 
     position_lower = position.lower()
@@ -32,9 +68,8 @@ def is_relevant_position(position, title, desc=None, fuzzy_threshold=82, semanti
     fuzzy_score = fuzz.partial_ratio(position_lower, title_lower)
 
     # --- Step 2: Semantic similarity between position & title ---
-    emb1 = model.encode(position_lower, convert_to_tensor=True)
-    emb2 = model.encode(title_lower, convert_to_tensor=True)
-    semantic_score = float(util.cos_sim(emb1, emb2))
+    if semantic_score is None:
+        semantic_score = semantic_scores(position, [title])[0]
 
     # --- Step 3: Domain keyword groups ---
     design_terms = ["ui", "ux", "design", "designer", "product design", "visual", "interface", "user experience", "interaction"]
@@ -121,15 +156,18 @@ def fetch_remoteok_jobs(position=None):
         print("⚠️ Error fetching RemoteOK:", e)
         return []
 
+    items = data[1:]  # skip metadata
+    scores = semantic_scores(position, [item.get("position", "") or "" for item in items]) if position else []
+
     jobs = []
-    for item in data[1:]:  # skip metadata
+    for i, item in enumerate(items):
         title = item.get("position", "") or ""
         desc = item.get("description", "") or ""
         company = item.get("company", "") or ""
         location = item.get("location", "Remote") or ""
         url = item.get("url", "") or ""
 
-        if not position or is_relevant_position(position, title, desc):
+        if not position or is_relevant_position(position, title, desc, semantic_score=scores[i]):
             jobs.append({
                 "Source": "RemoteOK",
                 "Title": title.strip(),
@@ -151,14 +189,17 @@ def fetch_weworkremotely_jobs(position=None):
         print("⚠️ Error parsing WWR feed:", e)
         return []
 
+    titles = [getattr(entry, "title", "") for entry in feed.entries]
+    scores = semantic_scores(position, titles) if position else []
+
     jobs = []
-    for entry in feed.entries:
+    for i, entry in enumerate(feed.entries):
         title = getattr(entry, "title", "")
         desc = getattr(entry, "summary", "")
         company = getattr(entry, "author", "Unknown")
         link = getattr(entry, "link", "")
 
-        if not position or is_relevant_position(position, title, desc):
+        if not position or is_relevant_position(position, title, desc, semantic_score=scores[i]):
             jobs.append({
                 "Source": "WeWorkRemotely",
                 "Title": title.strip(),
@@ -175,6 +216,7 @@ def fetch_weworkremotely_jobs(position=None):
 # 🧩 MAIN FETCHER (multi-keyword + multi-source)
 # ---------------------------------------------------------------------------
 
+@profiled("fetch_jobs")
 def fetch_jobs(keywords, sources=None):
     """
     Fetch and filter jobs from multiple sources.
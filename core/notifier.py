@@ -5,6 +5,7 @@ from email.mime.text import MIMEText
 import json
 import os
 import streamlit as st
+from core.profiler import profiled
 
 
 def load_credentials():
@@ -130,6 +131,7 @@ def build_html_email(jobs, recipient):
     return html
 
 
+@profiled("send_email")
 def send_email(jobs, recipient=None):
     """Send branded HTML email using Gmail credentials."""
     creds = load_credentials()
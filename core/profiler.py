@@ -0,0 +1,329 @@
+# core/profiler.py
+"""
+Built-in profiling mode for PyRemote-AI pipeline stages.
+
+Enable it with the PYREMOTE_PROFILE environment variable or the "profile" key
+in data/user_config.json. Supported modes:
+
+    deterministic  trace every Python call (exact, higher overhead)
+    sampling       sample the running stack every few milliseconds
+
+For each profiled stage the latest run is written under data/profiles/:
+
+    <stage>.collapsed   flamegraph-compatible collapsed stacks
+    <stage>.alloc.txt   top tracemalloc allocations made during the stage
+
+Stages called inside another profiled stage (e.g. is_relevant_position inside
+fetch_jobs) are aggregated over the outer run and get their own reports too.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+CONFIG_PATH = "data/user_config.json"
+PROFILE_DIR = "data/profiles"
+MODES = ("deterministic", "sampling")
+
+SAMPLE_INTERVAL = 0.005
+TOP_ALLOCATIONS = 25
+
+_local = threading.local()
+_config_cache = {"mtime": None, "mode": None}
+
+# tracemalloc and the peak counter are process-wide, so only one stage is
+# profiled at a time; a stage started while another run is active (e.g. a
+# second Streamlit session) runs unprofiled.
+_run_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------------
+# ⚙️ MODE RESOLUTION
+# ---------------------------------------------------------------------------
+
+def _normalize_mode(value):
+    value = str(value or "").strip().lower()
+    if value in ("1", "true", "yes", "on", "deterministic"):
+        return "deterministic"
+    if value == "sampling":
+        return "sampling"
+    return None
+
+
+def _config_mode():
+    """Read the "profile" key from the user config, re-reading only when it changes."""
+    try:
+        mtime = os.path.getmtime(CONFIG_PATH)
+    except OSError:
+        return None
+    if mtime != _config_cache["mtime"]:
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                mode = _normalize_mode(json.load(f).get("profile"))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError, AttributeError):
+            mode = None
+        _config_cache["mtime"] = mtime
+        _config_cache["mode"] = mode
+    return _config_cache["mode"]
+
+
+def profile_mode():
+    """Active profiling mode, or None. The environment variable wins over the config."""
+    env_value = os.environ.get("PYREMOTE_PROFILE")
+    if env_value is not None:
+        return _normalize_mode(env_value)
+    return _config_mode()
+
+
+# ---------------------------------------------------------------------------
+# 🔬 STACK COLLECTORS
+# ---------------------------------------------------------------------------
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _TracingCollector:
+    """Deterministic profiler: attributes self-time (µs) to every exact call stack."""
+
+    def __init__(self):
+        self.stacks = {}
+        self._stack = []
+        self._previous = None
+
+    def _callback(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "call":
+            self._stack.append([_frame_label(frame.f_code), now, 0.0])
+        elif event == "c_call":
+            self._stack.append([f"{getattr(arg, '__qualname__', repr(arg))} (builtin)", now, 0.0])
+        elif event in ("return", "c_return", "c_exception") and self._stack:
+            label, start, child = self._stack[-1]
+            key = ";".join(entry[0] for entry in self._stack)
+            elapsed = now - start
+            self._stack.pop()
+            self.stacks[key] = self.stacks.get(key, 0) + max(elapsed - child, 0.0) * 1e6
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def start(self):
+        self._previous = sys.getprofile()
+        sys.setprofile(self._callback)
+
+    def stop(self):
+        sys.setprofile(self._previous)
+
+
+class _SamplingCollector:
+    """Sampling profiler: counts how often each stack of the profiled thread is seen."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.stacks = {}
+        self.interval = interval
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                key = ";".join(reversed(labels))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+
+# ---------------------------------------------------------------------------
+# 📝 REPORTS
+# ---------------------------------------------------------------------------
+
+def _write_collapsed(path, stacks):
+    with open(path, "w", encoding="utf-8") as f:
+        for key, value in sorted(stacks.items()):
+            count = int(round(value))
+            if count > 0:
+                f.write(f"{key} {count}\n")
+
+
+def _write_allocations(path, stage, mode, elapsed, before, after, peak):
+    ignore = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    before = before.filter_traces(ignore)
+    after = after.filter_traces(ignore)
+    stats = after.compare_to(before, "lineno")
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Stage: {stage}\n")
+        f.write(f"Mode: {mode}\n")
+        f.write(f"Recorded: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Wall time: {elapsed:.3f} s\n")
+        f.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+        f.write("Allocation figures are process-wide (all threads).\n\n")
+        f.write(f"Top {TOP_ALLOCATIONS} allocation sites by growth:\n")
+        for stat in stats[:TOP_ALLOCATIONS]:
+            f.write(f"{stat}\n")
+
+
+def _nested_stacks(stacks, label):
+    """Stacks passing through `label`, re-rooted at that frame."""
+    nested = {}
+    for key, value in stacks.items():
+        frames = key.split(";")
+        if label in frames:
+            sub = ";".join(frames[frames.index(label):])
+            nested[sub] = nested.get(sub, 0) + value
+    return nested
+
+
+def _write_nested_summary(path, stage, outer, mode, entry):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Stage: {stage}\n")
+        f.write(f"Mode: {mode}\n")
+        f.write(f"Recorded: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Nested in: {outer}\n")
+        f.write(f"Calls: {entry['calls']}\n")
+        f.write(f"Total wall time: {entry['time']:.3f} s\n")
+        f.write(f"Net traced memory change: {entry['memory'] / 1024:.1f} KiB\n")
+        f.write("Allocation figures are process-wide (all threads).\n\n")
+        f.write(f"Allocation sites are listed in {outer}.alloc.txt.\n")
+
+
+def list_profiles():
+    """Return the paths of all profile reports currently under data/profiles."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return [
+        os.path.join(PROFILE_DIR, name)
+        for name in sorted(os.listdir(PROFILE_DIR))
+        if name.endswith((".collapsed", ".alloc.txt"))
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 🧩 STAGE DECORATOR
+# ---------------------------------------------------------------------------
+
+class _Run:
+    """One profiled stage run: stack collector plus before/after tracemalloc snapshots."""
+
+    def __init__(self, stage, mode):
+        self.stage = stage
+        self.mode = mode
+        self.collector = _TracingCollector() if mode == "deterministic" else _SamplingCollector()
+        self.nested = {}
+        self._started_tracing = False
+        self._collecting = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self.before = tracemalloc.take_snapshot()
+        self.start_time = time.perf_counter()
+        self.collector.start()
+        self._collecting = True
+
+    def stop(self):
+        """Stop collecting and take the closing snapshot; safe after a failed start()."""
+        try:
+            if self._collecting:
+                self.collector.stop()
+                self._collecting = False
+                self.elapsed = time.perf_counter() - self.start_time
+                self.after = tracemalloc.take_snapshot()
+                self.peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def record(self, stage, func, args, kwargs):
+        """Run a stage nested inside this run, adding up its calls, time and memory."""
+        entry = self.nested.setdefault(stage, {
+            "label": _frame_label(func.__code__), "calls": 0, "time": 0.0, "memory": 0,
+        })
+        memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry["calls"] += 1
+            entry["time"] += time.perf_counter() - start
+            entry["memory"] += tracemalloc.get_traced_memory()[0] - memory
+
+    def write(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, self.stage)
+        _write_collapsed(f"{base}.collapsed", self.collector.stacks)
+        _write_allocations(f"{base}.alloc.txt", self.stage, self.mode, self.elapsed,
+                           self.before, self.after, self.peak)
+        print(f"🧪 Profile for '{self.stage}' written to {base}.collapsed / {base}.alloc.txt")
+
+        for stage, entry in self.nested.items():
+            base = os.path.join(PROFILE_DIR, stage)
+            _write_collapsed(f"{base}.collapsed", _nested_stacks(self.collector.stacks, entry["label"]))
+            _write_nested_summary(f"{base}.alloc.txt", stage, self.stage, self.mode, entry)
+            print(f"🧪 Nested profile for '{stage}' written to {base}.collapsed / {base}.alloc.txt")
+
+
+def _profile_run(stage, mode, func, args, kwargs):
+    run = _Run(stage, mode)
+    try:
+        run.start()
+    except Exception as e:
+        run.stop()
+        print(f"⚠️ Could not start profiling '{stage}': {e}")
+        return func(*args, **kwargs)
+
+    _local.run = run
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.run = None
+        try:
+            run.stop()
+            run.write()
+        except Exception as e:
+            print(f"⚠️ Could not write profile for '{stage}': {e}")
+
+
+def profiled(stage):
+    """
+    Profile calls to the decorated function as `stage` when profiling is enabled.
+    Stages nested inside an already-profiled stage are recorded into the outer
+    run and reported separately. Only one run is profiled at a time.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = getattr(_local, "run", None)
+            if run is not None:
+                if stage == run.stage:
+                    return func(*args, **kwargs)
+                return run.record(stage, func, args, kwargs)
+
+            mode = profile_mode()
+            if mode is None or not _run_lock.acquire(blocking=False):
+                return func(*args, **kwargs)
+            try:
+                return _profile_run(stage, mode, func, args, kwargs)
+            finally:
+                _run_lock.release()
+        return wrapper
+    return decorator
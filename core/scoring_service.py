@@ -0,0 +1,313 @@
+# core/scoring_service.py
+"""
+Optional long-lived scoring service for PyRemote-AI.
+
+Holds a single warm copy of the SentenceTransformer model and its embedding
+cache, and answers batched (position, title) similarity requests over a Unix
+domain socket. Start it with:
+
+    python -m core.scoring_service
+
+`core.job_sources` uses it automatically when the socket is reachable and
+falls back to in-process scoring otherwise.
+"""
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+SOCKET_PATH = os.environ.get("PYREMOTE_SCORER_SOCKET", "data/scorer.sock")
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Batching knobs: how long the worker waits to collect requests from
+# concurrent clients, and the most pairs it encodes in one pass.
+BATCH_WINDOW = 0.005
+MAX_BATCH_PAIRS = 512
+MAX_CACHE_SIZE = 50000
+CLIENT_TIMEOUT = 30.0
+
+# Limits on what a client may send: seconds to deliver a request frame, and
+# the largest frame accepted. MAX_TEXT_BYTES only sizes MAX_FRAME_SIZE (room
+# for MAX_BATCH_PAIRS pairs of that length); single texts are not checked.
+REQUEST_TIMEOUT = 10.0
+MAX_TEXT_BYTES = 4096
+MAX_FRAME_SIZE = 4 + MAX_BATCH_PAIRS * 2 * (4 + MAX_TEXT_BYTES)
+
+
+# ---------------------------------------------------------------------------
+# 📦 BINARY FRAMING
+# ---------------------------------------------------------------------------
+# Every message is a frame: u32 payload length followed by the payload.
+# Request payload:  u32 pair count, then per pair two strings, each encoded
+#                   as u32 byte length + UTF-8 bytes (position, then title).
+# Response payload: u32 score count, then that many float32 scores.
+# All integers and floats are network byte order.
+
+_U32 = struct.Struct("!I")
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Socket closed mid-frame")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_frame(sock, payload):
+    sock.sendall(_U32.pack(len(payload)) + payload)
+
+
+def recv_frame(sock, max_size=None):
+    (length,) = _U32.unpack(_recv_exact(sock, _U32.size))
+    if max_size is not None and length > max_size:
+        raise ValueError(f"Frame of {length} bytes exceeds limit of {max_size}")
+    return _recv_exact(sock, length)
+
+
+def encode_pairs(pairs):
+    parts = [_U32.pack(len(pairs))]
+    for position, title in pairs:
+        for text in (position, title):
+            raw = text.encode("utf-8")
+            parts.append(_U32.pack(len(raw)))
+            parts.append(raw)
+    return b"".join(parts)
+
+
+def decode_pairs(payload):
+    (count,) = _U32.unpack_from(payload, 0)
+    offset = _U32.size
+    pairs = []
+    for _ in range(count):
+        texts = []
+        for _ in range(2):
+            (length,) = _U32.unpack_from(payload, offset)
+            offset += _U32.size
+            texts.append(payload[offset:offset + length].decode("utf-8"))
+            offset += length
+        pairs.append((texts[0], texts[1]))
+    return pairs
+
+
+def encode_scores(scores):
+    return _U32.pack(len(scores)) + struct.pack(f"!{len(scores)}f", *scores)
+
+
+def decode_scores(payload):
+    (count,) = _U32.unpack_from(payload, 0)
+    return list(struct.unpack_from(f"!{count}f", payload, _U32.size))
+
+
+# ---------------------------------------------------------------------------
+# 🔌 CLIENT
+# ---------------------------------------------------------------------------
+
+def score_pairs(pairs, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """
+    Ask the running scoring service for cosine similarities of (position, title)
+    pairs. Returns a list of floats, or None if the service is not available.
+    Large requests are split into chunks of MAX_BATCH_PAIRS pairs.
+    """
+    if not pairs:
+        return []
+
+    path = socket_path or SOCKET_PATH
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+
+    scores = []
+    for i in range(0, len(pairs), MAX_BATCH_PAIRS):
+        chunk = pairs[i:i + MAX_BATCH_PAIRS]
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(path)
+                send_frame(sock, encode_pairs(chunk))
+                chunk_scores = decode_scores(recv_frame(sock))
+        except (OSError, ConnectionError, struct.error) as e:
+            print(f"⚠️ Scoring service unavailable, falling back to local model: {e}")
+            return None
+        if len(chunk_scores) != len(chunk):
+            return None
+        scores.extend(chunk_scores)
+    return scores
+
+
+# ---------------------------------------------------------------------------
+# 🧠 SERVER
+# ---------------------------------------------------------------------------
+
+class _Job:
+    __slots__ = ("pairs", "scores", "error", "done")
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+        self.scores = None
+        self.error = None
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class BatchScorer:
+    """Collects requests from concurrent clients and scores them in one encode pass."""
+
+    def __init__(self, model_name=MODEL_NAME):
+        import torch
+        from sentence_transformers import SentenceTransformer, util
+
+        print(f"🧠 Loading SentenceTransformer model '{model_name}' for scoring service...")
+        self.model = SentenceTransformer(model_name)
+        self.torch = torch
+        self.util = util
+        self.cache = {}
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def close(self):
+        """Stop the worker thread once queued requests have been scored."""
+        self.jobs.put(_STOP)
+        self.worker.join()
+
+    def submit(self, pairs):
+        job = _Job(pairs)
+        self.jobs.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.scores
+
+    def _collect(self):
+        """Return (batch, stop): the jobs to score next, and whether close() was called."""
+        job = self.jobs.get()
+        if job is _STOP:
+            return [], True
+        batch = [job]
+        n_pairs = len(job.pairs)
+        deadline = time.monotonic() + BATCH_WINDOW
+        while n_pairs < MAX_BATCH_PAIRS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self.jobs.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+            n_pairs += len(job.pairs)
+        return batch, False
+
+    def _embed(self, texts):
+        unique = list(dict.fromkeys(texts))
+        result = {t: self.cache[t] for t in unique if t in self.cache}
+        missing = [t for t in unique if t not in result]
+        if missing:
+            if len(self.cache) + len(missing) > MAX_CACHE_SIZE:
+                self.cache.clear()
+            embeddings = self.model.encode(missing, convert_to_tensor=True)
+            for text, emb in zip(missing, embeddings):
+                result[text] = emb
+                self.cache[text] = emb
+        return result
+
+    def _score(self, pairs):
+        """Cosine similarity of every (position, title) pair in one vectorized call."""
+        if not pairs:
+            return []
+        embeddings = self._embed([t for pair in pairs for t in pair])
+        positions = self.torch.stack([embeddings[p] for p, _ in pairs])
+        titles = self.torch.stack([embeddings[t] for _, t in pairs])
+        return [float(s) for s in self.util.pairwise_cos_sim(positions, titles).tolist()]
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._collect()
+            try:
+                pairs = [pair for job in batch for pair in job.pairs]
+                scores = self._score(pairs)
+                offset = 0
+                for job in batch:
+                    job.scores = scores[offset:offset + len(job.pairs)]
+                    offset += len(job.pairs)
+            except Exception as e:
+                for job in batch:
+                    job.error = e
+            for job in batch:
+                job.done.set()
+
+
+class _ScoringHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            self.request.settimeout(REQUEST_TIMEOUT)
+            pairs = decode_pairs(recv_frame(self.request, max_size=MAX_FRAME_SIZE))
+            scores = self.server.scorer.submit(pairs)
+            send_frame(self.request, encode_scores(scores))
+        except Exception as e:
+            print(f"⚠️ Scoring request failed: {e}")
+
+
+class ScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, socket_path, scorer):
+        self.scorer = scorer
+        super().__init__(socket_path, _ScoringHandler)
+
+
+def _is_listening(path):
+    """
+    True if a service is answering on the socket at `path`, False if the socket
+    is stale. A busy service (full accept backlog) counts as running.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(path)
+        return True
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except (socket.timeout, BlockingIOError):
+        return True
+    except OSError as e:
+        raise SystemExit(f"⚠️ Cannot check existing scoring socket {path}: {e}")
+
+
+def serve(socket_path=None):
+    """Load the model once and serve scoring requests until interrupted."""
+    path = socket_path or SOCKET_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if os.path.exists(path):
+        if _is_listening(path):
+            raise SystemExit(f"⚠️ Scoring service is already running on {path}")
+        os.remove(path)  # stale socket left behind by a crashed service
+
+    scorer = BatchScorer()
+    with ScoringServer(path, scorer) as server:
+        print(f"✅ Scoring service listening on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scorer.close()
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,224 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import pytest
+
+from core import profiler
+from core.profiler import profiled
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("mode", ["deterministic", "sampling"])
+def test_overlapping_stages_in_threads(profile_dir, monkeypatch, mode):
+    monkeypatch.setenv("PYREMOTE_PROFILE", mode)
+    was_tracing = tracemalloc.is_tracing()
+    short_started = threading.Event()
+    long_started = threading.Event()
+    short_done = threading.Event()
+
+    @profiled("short")
+    def short():
+        # Starts tracing first, then finishes while "long" is still running.
+        short_started.set()
+        long_started.wait(5)
+        return "short"
+
+    @profiled("long")
+    def long():
+        long_started.set()
+        short_done.wait(5)
+        return "long"
+
+    results = {}
+    t_short = threading.Thread(target=lambda: results.setdefault("short", short()))
+    t_short.start()
+    short_started.wait(5)
+    t_long = threading.Thread(target=lambda: results.setdefault("long", long()))
+    t_long.start()
+    t_short.join(10)
+    short_done.set()
+    t_long.join(10)
+
+    assert results == {"short": "short", "long": "long"}
+    assert tracemalloc.is_tracing() == was_tracing
+    # Only one run is profiled at a time; "long" overlapped "short" and ran unprofiled.
+    assert (profile_dir / "short.collapsed").exists()
+    assert (profile_dir / "short.alloc.txt").exists()
+    assert not (profile_dir / "long.collapsed").exists()
+
+
+def test_report_failure_does_not_change_result(profile_dir, monkeypatch):
+    monkeypatch.setenv("PYREMOTE_PROFILE", "sampling")
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("report failed")
+
+    monkeypatch.setattr(profiler, "_write_allocations", broken)
+
+    @profiled("stage")
+    def stage():
+        return 42
+
+    was_tracing = tracemalloc.is_tracing()
+    assert stage() == 42
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_disabled_mode_does_not_profile(profile_dir, monkeypatch):
+    monkeypatch.setenv("PYREMOTE_PROFILE", "off")
+
+    @profiled("stage")
+    def stage():
+        return 1
+
+    assert stage() == 1
+    assert profiler.list_profiles() == []
+
+
+def test_deterministic_mode_restores_previous_profiler(profile_dir, monkeypatch):
+    monkeypatch.setenv("PYREMOTE_PROFILE", "deterministic")
+
+    def existing(frame, event, arg):
+        pass
+
+    @profiled("stage")
+    def stage():
+        return 1
+
+    previous = sys.getprofile()
+    sys.setprofile(existing)
+    try:
+        stage()
+        assert sys.getprofile() is existing
+    finally:
+        sys.setprofile(previous)
+
+
+def _read_collapsed(path):
+    lines = path.read_text(encoding="utf-8").splitlines()
+    stacks = {}
+    for line in lines:
+        key, count = line.rsplit(" ", 1)
+        assert count.isdigit() and int(count) > 0
+        assert key and all(frame for frame in key.split(";"))
+        stacks[key] = int(count)
+    return stacks
+
+
+def _busy(n):
+    return sum(len(str(i) * 3) for i in range(n))
+
+
+@pytest.mark.parametrize("mode", ["deterministic", "sampling"])
+def test_collapsed_report_shape(profile_dir, monkeypatch, mode):
+    monkeypatch.setenv("PYREMOTE_PROFILE", mode)
+    monkeypatch.setattr(profiler, "SAMPLE_INTERVAL", 0.001)
+
+    @profiled("outer")
+    def outer_stage():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            _busy(2000)
+        return "done"
+
+    assert outer_stage() == "done"
+
+    stacks = _read_collapsed(profile_dir / "outer.collapsed")
+    assert stacks
+    assert any("outer_stage (test_profiler.py:" in key for key in stacks)
+    assert "Stage: outer" in (profile_dir / "outer.alloc.txt").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("mode", ["deterministic", "sampling"])
+def test_nested_stage_is_recorded_in_outer_run(profile_dir, monkeypatch, mode):
+    monkeypatch.setenv("PYREMOTE_PROFILE", mode)
+    monkeypatch.setattr(profiler, "SAMPLE_INTERVAL", 0.001)
+
+    @profiled("inner")
+    def inner_stage():
+        return _busy(5000)
+
+    @profiled("outer")
+    def outer_stage():
+        deadline = time.perf_counter() + 0.05
+        calls = 0
+        while time.perf_counter() < deadline:
+            inner_stage()
+            calls += 1
+        return calls
+
+    calls = outer_stage()
+
+    # One outer run writes both reports; the nested stage is aggregated, not per call.
+    assert sorted(p.name for p in profile_dir.iterdir()) == [
+        "inner.alloc.txt", "inner.collapsed", "outer.alloc.txt", "outer.collapsed",
+    ]
+    summary = (profile_dir / "inner.alloc.txt").read_text(encoding="utf-8")
+    assert "Nested in: outer" in summary
+    assert f"Calls: {calls}" in summary
+
+    inner_stacks = _read_collapsed(profile_dir / "inner.collapsed")
+    assert inner_stacks
+    assert all(key.startswith("inner_stage (test_profiler.py:") for key in inner_stacks)
+
+
+# ---------------------------------------------------------------------------
+# ⚙️ Mode resolution
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def user_config(tmp_path, monkeypatch):
+    path = tmp_path / "user_config.json"
+    monkeypatch.setattr(profiler, "CONFIG_PATH", str(path))
+    monkeypatch.setattr(profiler, "_config_cache", {"mtime": None, "mode": None})
+    monkeypatch.delenv("PYREMOTE_PROFILE", raising=False)
+
+    def write(profile):
+        path.write_text(json.dumps({"email": "", "profile": profile}), encoding="utf-8")
+        stamp = time.time() + write.calls  # force a new mtime for each write
+        os.utime(path, (stamp, stamp))
+        write.calls += 1
+
+    write.calls = 0
+    return write
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("deterministic", "deterministic"),
+    ("sampling", "sampling"),
+    ("off", None),
+    (None, None),
+])
+def test_mode_from_user_config(user_config, value, expected):
+    user_config(value)
+    assert profiler.profile_mode() == expected
+
+
+def test_mode_follows_config_changes(user_config):
+    user_config("sampling")
+    assert profiler.profile_mode() == "sampling"
+    user_config("off")
+    assert profiler.profile_mode() is None
+
+
+def test_env_var_wins_over_config(user_config, monkeypatch):
+    user_config("sampling")
+    monkeypatch.setenv("PYREMOTE_PROFILE", "deterministic")
+    assert profiler.profile_mode() == "deterministic"
+    monkeypatch.setenv("PYREMOTE_PROFILE", "off")
+    assert profiler.profile_mode() is None
+
+
+def test_missing_config_disables_profiling(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "CONFIG_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.delenv("PYREMOTE_PROFILE", raising=False)
+    assert profiler.profile_mode() is None
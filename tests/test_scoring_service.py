@@ -0,0 +1,228 @@
+import math
+import socket
+import sys
+import threading
+import types
+
+import pytest
+
+from core import scoring_service
+
+
+# ---------------------------------------------------------------------------
+# 📦 Framing
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("pairs", [
+    [],
+    [("machine learning engineer", "Senior ML Engineer")],
+    [("ux designer", ""), ("", "")],
+    [("エンジニア", "Développeur Python — télétravail 🌍"), ("data", "Data Scientist")],
+])
+def test_pairs_round_trip(pairs):
+    assert scoring_service.decode_pairs(scoring_service.encode_pairs(pairs)) == pairs
+
+
+@pytest.mark.parametrize("scores", [[], [0.5], [0.0, 1.0, -0.25, 0.125]])
+def test_scores_round_trip(scores):
+    assert scoring_service.decode_scores(scoring_service.encode_scores(scores)) == scores
+
+
+def test_frame_round_trip_over_socket():
+    payload = scoring_service.encode_pairs([("teacher", "Online Tutor ✏️")])
+    a, b = socket.socketpair()
+    with a, b:
+        scoring_service.send_frame(a, payload)
+        assert scoring_service.recv_frame(b) == payload
+
+
+def test_recv_frame_rejects_oversized_length():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(scoring_service._U32.pack(1024))
+        with pytest.raises(ValueError):
+            scoring_service.recv_frame(b, max_size=16)
+
+
+# ---------------------------------------------------------------------------
+# 🧠 BatchScorer (stub model)
+# ---------------------------------------------------------------------------
+
+class _StubModel:
+    """Embeds a text as [len(text), 1] so scores are easy to predict."""
+
+    def __init__(self, name):
+        self.encoded = []
+
+    def encode(self, texts, convert_to_tensor=True):
+        self.encoded.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class _LocalStubModel(_StubModel):
+    """Like _StubModel, but also accepts a single string as the fallback path does."""
+
+    def encode(self, texts, convert_to_tensor=True):
+        if isinstance(texts, str):
+            return super().encode([texts])[0]
+        return super().encode(texts)
+
+
+def _cos_sim(a, b):
+    return (a[0] * b[0] + a[1] * b[1]) / (math.hypot(*a) * math.hypot(*b))
+
+
+class _Rows(list):
+    def tolist(self):
+        return list(self)
+
+
+def _pairwise_cos_sim(a, b):
+    return _Rows(_cos_sim(x, y) for x, y in zip(a, b))
+
+
+def _expected(position, title):
+    return _cos_sim([len(position), 1.0], [len(title), 1.0])
+
+
+def _matrix_cos_sim(a, b):
+    """cos_sim as used by the in-process fallback: one vector against many."""
+    return [[_cos_sim(a, y) for y in b]]
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    stub = types.ModuleType("sentence_transformers")
+    stub.SentenceTransformer = _StubModel
+    stub.util = types.SimpleNamespace(cos_sim=_matrix_cos_sim, pairwise_cos_sim=_pairwise_cos_sim)
+    torch_stub = types.ModuleType("torch")
+    torch_stub.stack = list
+    monkeypatch.setitem(sys.modules, "sentence_transformers", stub)
+    monkeypatch.setitem(sys.modules, "torch", torch_stub)
+
+
+@pytest.fixture
+def scorer(stub_model):
+    scorer = scoring_service.BatchScorer()
+    yield scorer
+    scorer.close()
+
+
+@pytest.fixture
+def server(scorer, tmp_path):
+    path = str(tmp_path / "scorer.sock")
+    server = scoring_service.ScoringServer(path, scorer)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_concurrent_submits_are_batched(scorer):
+    results = {}
+    start = threading.Barrier(20)
+
+    def client(i):
+        start.wait()
+        results[i] = scorer.submit([("engineer", "x" * i)])
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    assert len(results) == 20
+    for i, scores in results.items():
+        assert scores == pytest.approx([_expected("engineer", "x" * i)])
+    # Requests from concurrent clients share encode passes.
+    assert len(scorer.model.encoded) < 20
+
+
+def test_cache_overflow_keeps_scoring(scorer, monkeypatch):
+    monkeypatch.setattr(scoring_service, "MAX_CACHE_SIZE", 4)
+
+    assert scorer.submit([("a", "bb")]) == pytest.approx([_expected("a", "bb")])
+    pairs = [("a", "ccc"), ("a", "dddd"), ("a", "eeeee")]
+    assert scorer.submit(pairs) == pytest.approx([_expected(p, t) for p, t in pairs])
+    assert len(scorer.cache) <= 4
+
+
+def test_close_stops_worker(scorer):
+    scorer.close()
+    assert not scorer.worker.is_alive()
+
+
+# ---------------------------------------------------------------------------
+# 🔌 Client ↔ server over a Unix socket
+# ---------------------------------------------------------------------------
+
+def test_score_pairs_over_socket(server):
+    pairs = [("ml engineer", "Machine Learning Engineer"), ("ux", "")]
+    scores = scoring_service.score_pairs(pairs, socket_path=server)
+    assert scores == pytest.approx([_expected(p, t) for p, t in pairs], rel=1e-6)
+
+
+def test_score_pairs_splits_large_requests(server, scorer, monkeypatch):
+    monkeypatch.setattr(scoring_service, "MAX_BATCH_PAIRS", 2)
+    sizes = []
+    submit = scorer.submit
+
+    def recording_submit(pairs):
+        sizes.append(len(pairs))
+        return submit(pairs)
+
+    monkeypatch.setattr(scorer, "submit", recording_submit)
+    pairs = [("dev", "x" * i) for i in range(5)]
+    scores = scoring_service.score_pairs(pairs, socket_path=server)
+
+    assert sorted(sizes) == [1, 2, 2]
+    assert scores == pytest.approx([_expected(p, t) for p, t in pairs], rel=1e-6)
+
+
+def test_score_pairs_without_service(tmp_path):
+    assert scoring_service.score_pairs([("a", "b")], socket_path=str(tmp_path / "missing.sock")) is None
+
+
+def test_score_pairs_with_stale_socket(tmp_path):
+    path = str(tmp_path / "stale.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(path)  # bound but never listening, like a crashed service
+    assert scoring_service.score_pairs([("a", "b")], socket_path=path) is None
+
+
+# ---------------------------------------------------------------------------
+# 🔍 job_sources.semantic_scores
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def job_sources():
+    for dep in ("requests", "feedparser", "rapidfuzz"):
+        pytest.importorskip(dep)
+    from core import job_sources
+    return job_sources
+
+
+def test_semantic_scores_uses_service(job_sources, server, monkeypatch):
+    def no_local_model():
+        raise AssertionError("local model must not load while the service runs")
+
+    monkeypatch.setattr(scoring_service, "SOCKET_PATH", server)
+    monkeypatch.setattr(job_sources, "get_model", no_local_model)
+
+    titles = ["Data Scientist", "ML Engineer"]
+    assert job_sources.semantic_scores("Machine Learning", titles) == pytest.approx(
+        [_expected("machine learning", t.lower()) for t in titles], rel=1e-6
+    )
+
+
+def test_semantic_scores_falls_back_to_local_model(job_sources, stub_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(scoring_service, "SOCKET_PATH", str(tmp_path / "missing.sock"))
+    monkeypatch.setattr(job_sources, "get_model", lambda: _LocalStubModel(scoring_service.MODEL_NAME))
+
+    titles = ["Data Scientist", "ML Engineer"]
+    assert job_sources.semantic_scores("Machine Learning", titles) == pytest.approx(
+        [_expected("machine learning", t.lower()) for t in titles]
+    )